@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 import re
 import string
-from typing import Any, Iterator, List, Sequence, Tuple, Union, cast
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union, cast
 
 from werkzeug.datastructures import FileStorage
 
@@ -22,11 +22,15 @@ class File:
 class Extractor:
     UPLOAD_TITLE = re.compile(r'Upload\s+(\d+)', re.IGNORECASE)
 
-    def __init__(self, to_extract: FileStorage):
+    def __init__(
+        self, to_extract: FileStorage, file_content: Optional[bytes] = None,
+    ):
         self.to_extract = to_extract
-        cursor_position = to_extract.tell()
-        self.file_content = to_extract.read()
-        to_extract.seek(cursor_position)
+        if file_content is None:
+            cursor_position = to_extract.tell()
+            file_content = to_extract.read()
+            to_extract.seek(cursor_position)
+        self.file_content = file_content
         self.filename = to_extract.filename
 
     @staticmethod
@@ -80,7 +84,10 @@ class Extractor:
     def __iter__(self) -> Iterator[Tuple[int, List[File], str]]:
         for cls in self.__class__.__subclasses__():
             log.debug(f'Trying extractor: {cls.__name__}')
-            extractor = cls(to_extract=self.to_extract)
+            # The upload was already read, so the extractors share it.
+            extractor = cls(
+                to_extract=self.to_extract, file_content=self.file_content,
+            )
             if extractor.can_extract():
                 yield from (
                     (solution_id, files, hashing.by_content(str(files)))
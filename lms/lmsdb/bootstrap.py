@@ -2,7 +2,7 @@ from typing import Any, Callable, Optional, Tuple, Type
 
 from peewee import (
     Entity, Expression, Field, Model, OP, OperationalError, ProgrammingError,
-    SQL,
+    SQL, fn,
 )
 from playhouse.migrate import migrate
 
@@ -237,8 +237,51 @@ def _api_keys_migration() -> bool:
     return True
 
 
+def _unique_exercise_test_names_migration() -> bool:
+    ExerciseTestName = models.ExerciseTestName
+    Execution = models.SolutionExerciseTestExecution
+    if not ExerciseTestName.table_exists():
+        return False
+
+    # The unique (exercise_test, test_name) index used to be declared out of
+    # Meta, so older databases may hold duplicates that would block it.
+    duplicates = (
+        ExerciseTestName
+        .select(
+            ExerciseTestName.exercise_test, ExerciseTestName.test_name,
+            fn.MIN(ExerciseTestName.id).alias('kept_id'),
+        )
+        .group_by(ExerciseTestName.exercise_test, ExerciseTestName.test_name)
+        .having(fn.COUNT(ExerciseTestName.id) > 1)
+        .dicts()
+    )
+    with db_config.database.transaction():
+        for duplicate in tuple(duplicates):
+            log.info(
+                'Merging duplicates of test name '
+                f'{duplicate["test_name"]} into {duplicate["kept_id"]}',
+            )
+            duplicate_ids = ExerciseTestName.select(ExerciseTestName.id).where(
+                ExerciseTestName.exercise_test == duplicate['exercise_test'],
+                ExerciseTestName.test_name == duplicate['test_name'],
+                ExerciseTestName.id != duplicate['kept_id'],
+            )
+            Execution.update(
+                {Execution.exercise_test_name: duplicate['kept_id']},
+            ).where(
+                Execution.exercise_test_name.in_(duplicate_ids),
+            ).execute()
+            ExerciseTestName.delete().where(
+                ExerciseTestName.id.in_(duplicate_ids),
+            ).execute()
+        ExerciseTestName._schema.create_indexes(safe=True)
+        db_config.database.commit()
+    return True
+
+
 def main():
     with models.database.connection_context():
+        _unique_exercise_test_names_migration()
         models.database.create_tables(models.ALL_MODELS, safe=True)
 
         if models.Role.select().count() == 0:
@@ -1,10 +1,8 @@
 import os
 
-from peewee import (
-    PostgresqlDatabase,
-    SqliteDatabase,
-)
+from peewee import SqliteDatabase
 from playhouse.migrate import PostgresqlMigrator, SqliteMigrator  # noqa: I201
+from playhouse.pool import PooledPostgresqlExtDatabase
 from playhouse.postgres_ext import JSONField as PostgresJsonField
 from playhouse.sqlite_ext import JSONField as SqliteJsonField
 
@@ -15,6 +13,8 @@ DB_PORT = int(os.getenv('DB_PORT', 5432))
 DB_HOST = os.getenv('DB_HOST', '127.0.0.1')
 DB_PASSWORD = os.getenv('DB_PASSWORD')
 DB_AUTOROLLBACK = os.getenv('DB_AUTOROLLBACK')
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', 32))
+DB_STALE_TIMEOUT = int(os.getenv('DB_STALE_TIMEOUT', 300))
 # SQLite resides in main directory
 SQLITE_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'db.sqlite')
 
@@ -31,8 +31,13 @@ else:
         'host': DB_HOST,
         'password': DB_PASSWORD,
         'autorollback': DB_AUTOROLLBACK,
+        'max_connections': DB_MAX_CONNECTIONS,
+        'stale_timeout': DB_STALE_TIMEOUT,
     }
-    database = PostgresqlDatabase(**db_config)
+    # Closing a pooled connection returns it to the pool, so requests
+    # don't reconnect to the server every time. The Ext flavour matches the
+    # postgres_ext JSONField used by the models.
+    database = PooledPostgresqlExtDatabase(**db_config)
     JsonField = PostgresJsonField
     migrator = PostgresqlMigrator(database)
 
@@ -3,6 +3,7 @@ import enum
 import html
 import secrets
 import string
+import time
 from datetime import datetime
 from typing import (
     Any, Dict, Iterable, List, Optional, TYPE_CHECKING, Tuple,
@@ -13,9 +14,11 @@ from flask_babel import gettext as _  # type: ignore
 from flask_login import UserMixin, current_user  # type: ignore
 from peewee import (  # type: ignore
     BooleanField, Case, CharField, Check, DateTimeField, ForeignKeyField,
-    IntegerField, JOIN, ManyToManyField, TextField, fn,
+    IntegerField, JOIN, ManyToManyField, SQL, TextField, fn,
+)
+from playhouse.signals import (  # type: ignore
+    Model, post_delete, post_save, pre_save,
 )
-from playhouse.signals import Model, post_save, pre_save  # type: ignore
 from werkzeug.security import (
     check_password_hash, generate_password_hash,
 )
@@ -28,6 +31,12 @@ from lms.utils.log import log
 
 database = database_config.get_db_instance()
 ExercisesDictById = Dict[int, Dict[str, Any]]
+HASHED_PASSWORD_PREFIX = 'pbkdf2:sha256'
+HASHED_PASSWORD_ITERATIONS = 150_000  # Werkzeug's current default
+HASHED_PASSWORD_METHOD = (
+    f'{HASHED_PASSWORD_PREFIX}:{HASHED_PASSWORD_ITERATIONS}'
+)
+_ROLES_CACHE: Dict[str, 'Role'] = {}
 if TYPE_CHECKING:
     from lms.extractors.base import File
 
@@ -73,28 +82,36 @@ class Role(BaseModel):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def _get_cached(cls, name: str) -> 'Role':
+        # The roles table is tiny and never changes while running
+        role = _ROLES_CACHE.get(name)
+        if role is None:
+            role = _ROLES_CACHE[name] = cls.get(cls.name == name)
+        return role
+
     @classmethod
     def get_banned_role(cls) -> 'Role':
-        return cls.get(Role.name == RoleOptions.BANNED.value)
+        return cls._get_cached(RoleOptions.BANNED.value)
 
     @classmethod
     def get_student_role(cls) -> 'Role':
-        return cls.get(Role.name == RoleOptions.STUDENT.value)
+        return cls._get_cached(RoleOptions.STUDENT.value)
 
     @classmethod
     def get_staff_role(cls) -> 'Role':
-        return cls.get(Role.name == RoleOptions.STAFF.value)
+        return cls._get_cached(RoleOptions.STAFF.value)
 
     @classmethod
     def get_admin_role(cls) -> 'Role':
-        return cls.get(Role.name == RoleOptions.ADMINISTRATOR.value)
+        return cls._get_cached(RoleOptions.ADMINISTRATOR.value)
 
     @classmethod
     def by_name(cls, name) -> 'Role':
         if name.startswith('_'):
             raise ValueError('That could lead to a security issue.')
         role_name = getattr(RoleOptions, name.upper()).value
-        return cls.get(name=role_name)
+        return cls._get_cached(role_name)
 
     @property
     def is_banned(self) -> bool:
@@ -145,6 +162,10 @@ class User(UserMixin, BaseModel):
         })
         return instance
 
+    @staticmethod
+    def hash_secret(secret: str) -> str:
+        return generate_password_hash(secret, method=HASHED_PASSWORD_METHOD)
+
     @classmethod
     def random_password(cls, stronger: bool = False) -> str:
         length_params = {'min_len': 40, 'max_len': 41} if stronger else {}
@@ -188,15 +209,19 @@ def on_save_handler(model_class, instance, created):
     """Hash password on creation/save."""
 
     # If password changed then it won't start with hash's method prefix
-    is_password_changed = not instance.password.startswith('pbkdf2:sha256')
+    is_password_changed = (
+        not instance.password.startswith(HASHED_PASSWORD_PREFIX)
+    )
     if created or is_password_changed:
-        instance.password = generate_password_hash(instance.password)
+        instance.password = model_class.hash_secret(instance.password)
 
-    is_api_key_changed = not instance.api_key.startswith('pbkdf2:sha256')
+    is_api_key_changed = (
+        not instance.api_key.startswith(HASHED_PASSWORD_PREFIX)
+    )
     if created or is_api_key_changed:
         if not instance.api_key:
             instance.api_key = model_class.random_password()
-        instance.api_key = generate_password_hash(instance.api_key)
+        instance.api_key = model_class.hash_secret(instance.api_key)
 
 
 class Notification(BaseModel):
@@ -211,6 +236,11 @@ class Notification(BaseModel):
     action_url = CharField(null=True)
     viewed = BooleanField(default=False)
 
+    class Meta:
+        indexes = (
+            (('user', 'created'), False),
+        )
+
     def read(self) -> bool:
         self.viewed = True
         return bool(self.save())
@@ -221,7 +251,6 @@ class Notification(BaseModel):
         return (
             cls
             .select()
-            .join(User)
             .where(user_id)
             .order_by(Notification.created.desc())
             .limit(cls.MAX_PER_USER)
@@ -240,7 +269,6 @@ class Notification(BaseModel):
         return (
             cls
             .select()
-            .join(User)
             .where(*where_clause)
             .limit(cls.MAX_PER_USER)
         )
@@ -269,15 +297,28 @@ def on_notification_saved(
     instance: Notification,
     created: datetime,
 ):
-    # sqlite supports delete query with order
-    # but when we use postgres, peewee is stupid
-    old_notifications = Notification.select().where(
-        Notification.user == instance.user.id,
+    # Ids are assigned in creation order, so the oldest notification we
+    # keep marks the cutoff, and the user index serves the lookup.
+    # The DELETE itself needs no ORDER BY, and while the user has fewer
+    # than MAX_PER_USER notifications the cutoff is NULL and nothing is
+    # deleted.
+    oldest_kept_id = Notification.select(Notification.id).where(
+        Notification.user == instance.user_id,
     ).order_by(
-        Notification.created.desc(),
-    ).offset(Notification.MAX_PER_USER)
-    for instance in old_notifications:
-        instance.delete_instance()
+        Notification.id.desc(),
+    ).limit(1).offset(Notification.MAX_PER_USER - 1)
+    Notification.delete().where(
+        Notification.user == instance.user_id,
+        Notification.id < oldest_kept_id,
+    ).execute()
+
+
+EXERCISES_CACHE_TTL_SECONDS = 30
+_EXERCISES_CACHE: Dict[bool, Tuple[float, Tuple[Dict[str, Any], ...]]] = {}
+
+
+def clear_exercises_cache() -> None:
+    _EXERCISES_CACHE.clear()
 
 
 class Exercise(BaseModel):
@@ -289,6 +330,11 @@ class Exercise(BaseModel):
     notebook_num = IntegerField(default=0)
     order = IntegerField(default=0, index=True)
 
+    class Meta:
+        indexes = (
+            (('is_archived', 'order'), False),
+        )
+
     def open_for_new_solutions(self) -> bool:
         if self.due_date is None:
             return not self.is_archived
@@ -301,6 +347,31 @@ class Exercise(BaseModel):
             exercises = exercises.where(cls.is_archived == False)  # NOQA: E712
         return exercises
 
+    @classmethod
+    def cached_dicts(
+        cls, fetch_archived: bool = False,
+    ) -> Tuple[Dict[str, Any], ...]:
+        """
+        The exercises as dicts, cached per process for
+        EXERCISES_CACHE_TTL_SECONDS.
+        Saving or deleting an exercise clears only the cache of the process
+        that did it. Bulk writes (update, insert_many) send no signals, so
+        the cache is only eventually consistent: after an edit from another
+        process or a bulk write, the results may show archived or renamed
+        exercises, or miss new ones, for up to EXERCISES_CACHE_TTL_SECONDS.
+        """
+        cached = _EXERCISES_CACHE.get(fetch_archived)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        exercises = tuple(
+            exercise.as_dict()
+            for exercise in cls.get_objects(fetch_archived=fetch_archived)
+        )
+        expires_at = time.monotonic() + EXERCISES_CACHE_TTL_SECONDS
+        _EXERCISES_CACHE[fetch_archived] = (expires_at, exercises)
+        return exercises
+
     def as_dict(self) -> Dict[str, Any]:
         return {
             'exercise_id': self.id,
@@ -318,6 +389,12 @@ class Exercise(BaseModel):
         return self.subject
 
 
+@post_save(sender=Exercise)
+@post_delete(sender=Exercise)
+def on_exercise_change_handler(model_class, instance, *args, **kwargs):
+    clear_exercises_cache()
+
+
 class SolutionState(enum.Enum):
     CREATED = 'Created'
     IN_CHECKING = 'In checking'
@@ -338,6 +415,11 @@ class SolutionState(enum.Enum):
         return tuple((choice.name, choice.value) for choice in choices)
 
 
+# Enum members are fixed, so compute these once instead of on every query
+SolutionState.ACTIVE = tuple(SolutionState.active_solutions())
+SolutionState.CHOICES = SolutionState.to_choices()
+
+
 class Solution(BaseModel):
     STATES = SolutionState
     MAX_CHECK_TIME_SECONDS = 60 * 10
@@ -346,7 +428,7 @@ class Solution(BaseModel):
     solver = ForeignKeyField(User, backref='solutions')
     checker = ForeignKeyField(User, null=True, backref='solutions')
     state = CharField(
-        choices=STATES.to_choices(),
+        choices=STATES.CHOICES,
         default=STATES.CREATED.name,
         index=True,
     )
@@ -356,6 +438,12 @@ class Solution(BaseModel):
     submission_timestamp = DateTimeField(index=True)
     hashed = TextField()
 
+    class Meta:
+        indexes = (
+            (('exercise', 'state'), False),
+            (('solver', 'exercise', 'submission_timestamp'), False),
+        )
+
     @property
     def solution_files(
             self,
@@ -396,6 +484,32 @@ class Solution(BaseModel):
 
         return last_submission_hash == hash_
 
+    @classmethod
+    def files_hash(
+        cls, files: List['File'], hash_: Optional[str] = None,
+    ) -> Optional[str]:
+        """The hash stored for a solution: a single file by its code."""
+        if len(files) == 1:
+            return cls.create_hash(files[0].code)
+        return hash_
+
+    @classmethod
+    def last_hashes(
+        cls, user: User, exercise_ids: Iterable[int],
+    ) -> Dict[int, Optional[str]]:
+        """The hash of the user's latest submission to each exercise."""
+        solutions = (
+            cls
+            .select(cls.exercise, cls.hashed)
+            .where(cls.solver == user, cls.exercise.in_(list(exercise_ids)))
+            .order_by(cls.submission_timestamp.desc())
+            .dicts()
+        )
+        hashes: Dict[int, Optional[str]] = {}
+        for solution in solutions.iterator():
+            hashes.setdefault(solution['exercise'], solution['hashed'])
+        return hashes
+
     def start_checking(self) -> bool:
         return self.set_state(Solution.STATES.IN_CHECKING)
 
@@ -410,6 +524,19 @@ class Solution(BaseModel):
         updated = changes.execute() == 1
         return updated
 
+    @classmethod
+    def get_with_details(cls, solution_id: int) -> Optional['Solution']:
+        """Fetch a solution along with its exercise and solver."""
+        return (
+            cls
+            .select(cls, Exercise, User)
+            .join(Exercise)
+            .switch()
+            .join(User, on=(cls.solver == User.id))
+            .where(cls.id == solution_id)
+            .first()
+        )
+
     def ordered_versions(self) -> Iterable['Solution']:
         return Solution.select().where(
             Solution.exercise == self.exercise,
@@ -423,30 +550,63 @@ class Solution(BaseModel):
     def of_user(
         cls, user_id: int, with_archived: bool = False,
     ) -> Iterable[Dict[str, Any]]:
-        db_exercises = Exercise.get_objects(fetch_archived=with_archived)
-        exercises = Exercise.as_dicts(db_exercises)
-
+        db_exercises = Exercise.cached_dicts(fetch_archived=with_archived)
+        exercise_ids = [exercise['exercise_id'] for exercise in db_exercises]
         solutions = (
             cls
-            .select(cls.exercise, cls.id, cls.state, cls.checker)
-            .where(cls.exercise.in_(db_exercises), cls.solver == user_id)
+            .select(
+                cls.exercise, cls.id, cls.state,
+                User.fullname.alias('checker_name'),
+            )
+            .join(User, JOIN.LEFT_OUTER, on=(cls.checker == User.id))
+            .where(cls.solver == user_id, cls.exercise.in_(exercise_ids))
             .order_by(cls.submission_timestamp.desc())
+            .dicts()
+            .iterator()
         )
+
+        # Solutions come newest first, so keep the first one per exercise.
+        last_solutions: Dict[int, Dict[str, Any]] = {}
         for solution in solutions:
-            exercise = exercises[solution.exercise_id]
-            if exercise.get('solution_id') is None:
-                exercise['solution_id'] = solution.id
-                exercise['is_checked'] = solution.is_checked
-                exercise['comments_num'] = len(solution.staff_comments)
-                if solution.is_checked and solution.checker:
-                    exercise['checker'] = solution.checker.fullname
-        return tuple(exercises.values())
+            last_solutions.setdefault(solution['exercise'], solution)
+
+        comments_count = dict(
+            Comment
+            .select(SolutionFile.solution, fn.Count(Comment.id))
+            .join(SolutionFile)
+            .switch()
+            .join(User)
+            .where(
+                SolutionFile.solution.in_(
+                    [solution['id'] for solution in last_solutions.values()],
+                ),
+                User.role.in_(
+                    (Role.get_staff_role().id, Role.get_admin_role().id),
+                ),
+            )
+            .group_by(SolutionFile.solution)
+            .tuples(),
+        )
+
+        exercises = []
+        for db_exercise in db_exercises:
+            exercise = dict(db_exercise)
+            solution = last_solutions.get(exercise['exercise_id'])
+            if solution is not None:
+                is_checked = solution['state'] == cls.STATES.DONE.name
+                exercise['solution_id'] = solution['id']
+                exercise['is_checked'] = is_checked
+                exercise['comments_num'] = comments_count.get(
+                    solution['id'], 0,
+                )
+                if is_checked and solution['checker_name']:
+                    exercise['checker'] = solution['checker_name']
+            exercises.append(exercise)
+        return tuple(exercises)
 
     @property
     def comments(self):
-        return Comment.select().join(
-            SolutionFile,
-        ).where(SolutionFile.solution == self)
+        return Comment.by_solution(self)
 
     @property
     def ordered_comments(self):
@@ -454,14 +614,14 @@ class Solution(BaseModel):
 
     @property
     def staff_comments(self):
-        return self.comments.switch(Comment).join(User).join(Role).where(
-            (Comment.commenter.role == Role.get_staff_role().id)
-            | (Comment.commenter.role == Role.get_admin_role().id),
+        return self.comments.where(
+            (User.role == Role.get_staff_role().id)
+            | (User.role == Role.get_admin_role().id),
         )
 
     @property
     def comments_per_file(self):
-        return Counter(c.file.id for c in self.staff_comments)
+        return Counter(c.file_id for c in self.staff_comments)
 
     @classmethod
     def create_solution(
@@ -470,14 +630,18 @@ class Solution(BaseModel):
         solver: User,
         files: List['File'],
         hash_: Optional[str] = None,
+        is_duplicate: Optional[bool] = None,
     ) -> 'Solution':
-        if len(files) == 1:
-            hash_ = cls.create_hash(files[0].code)
-
-        if (
-            hash_
-            and cls.is_duplicate(hash_, solver, exercise, already_hashed=True)
-        ):
+        """
+        Pass is_duplicate when the caller already compared the hash with
+        the last submission, to skip looking it up again.
+        """
+        hash_ = cls.files_hash(files, hash_)
+        if is_duplicate is None:
+            is_duplicate = bool(hash_) and cls.is_duplicate(
+                hash_, solver, exercise, already_hashed=True,
+            )
+        if is_duplicate:
             raise AlreadyExists('This solution already exists.')
 
         instance = cls.create(**{
@@ -499,44 +663,39 @@ class Solution(BaseModel):
         SolutionFile.insert_many(files_details).execute()
 
         # update old solutions for this exercise
-        other_solutions: Iterable[Solution] = cls.select().where(
+        cls.update(**{
+            cls.state.name: Solution.STATES.OLD_SOLUTION.name,
+        }).where(
             cls.exercise == exercise,
             cls.solver == solver,
             cls.id != instance.id,
-        )
-        for old_solution in other_solutions:
-            old_solution.set_state(Solution.STATES.OLD_SOLUTION)
+        ).execute()
         return instance
 
     @classmethod
     def _base_next_unchecked(cls):
-        comments_count = fn.Count(Comment.id).alias('comments_count')
-        fails = fn.Count(SolutionExerciseTestExecution.id).alias('failures')
+        comments_count = (
+            Comment
+            .select(fn.Count(Comment.id))
+            .join(SolutionFile)
+            .where(SolutionFile.solution == cls.id)
+        )
+        fails = (
+            SolutionExerciseTestExecution
+            .select(fn.Count(SolutionExerciseTestExecution.id))
+            .where(SolutionExerciseTestExecution.solution == cls.id)
+        )
         return cls.select(
             cls.id,
             cls.state,
             cls.exercise,
-            comments_count,
-            fails,
-        ).join(
-            SolutionFile,
-            join_type=JOIN.LEFT_OUTER,
-            on=(SolutionFile.solution == cls.id),
-        ).join(
-            Comment,
-            join_type=JOIN.LEFT_OUTER,
-            on=(Comment.file == SolutionFile.id),
-        ).join(
-            SolutionExerciseTestExecution,
-            join_type=JOIN.LEFT_OUTER,
-            on=(SolutionExerciseTestExecution.solution == cls.id),
+            comments_count.alias('comments_count'),
+            fails.alias('failures'),
         ).where(
             cls.state == Solution.STATES.CREATED.name,
-        ).group_by(
-            cls.id,
         ).order_by(
-            comments_count,
-            fails,
+            SQL('comments_count'),
+            SQL('failures'),
             cls.submission_timestamp.asc(),
         )
 
@@ -567,6 +726,8 @@ class Solution(BaseModel):
 
     @classmethod
     def status(cls):
+        # SUM over a CASE rather than COUNT(...) FILTER, which SQLite only
+        # supports from 3.30.
         one_if_is_checked = Case(
             Solution.state, ((Solution.STATES.DONE.name, 1),), 0,
         )
@@ -578,38 +739,45 @@ class Solution(BaseModel):
             fn.Sum(one_if_is_checked).alias('checked'),
         )
         join_by_exercise = (Solution.exercise == Exercise.id)
-        active_solutions = Solution.state.in_(
-            Solution.STATES.active_solutions(),
-        )
+        active_solutions = Solution.state.in_(Solution.STATES.ACTIVE)
         return (
             Exercise
             .select(*fields)
             .join(Solution, JOIN.LEFT_OUTER, on=join_by_exercise)
             .where(active_solutions)
-            .group_by(Exercise.subject, Exercise.id)
+            .group_by(Exercise.id)
             .order_by(Exercise.id)
+            .dicts()
         )
 
     @classmethod
     def left_in_exercise(cls, exercise: Exercise) -> int:
-        one_if_is_checked = Case(
-            Solution.state, ((Solution.STATES.DONE.name, 1),), 0)
-        active_solutions = cls.state.in_(Solution.STATES.active_solutions())
-        response = cls.filter(
+        hundred_if_is_checked = Case(
+            Solution.state, ((Solution.STATES.DONE.name, 100),), 0)
+        active_solutions = cls.state.in_(Solution.STATES.ACTIVE)
+        checked_percentage = cls.filter(
             cls.exercise == exercise,
             active_solutions,
         ).select(
-            fn.Count(cls.id).alias('submitted'),
-            fn.Sum(one_if_is_checked).alias('checked'),
-        ).dicts().get()
-        return int(response['checked'] * 100 / response['submitted'])
+            fn.COALESCE(fn.AVG(hundred_if_is_checked), 0),
+        ).scalar()
+        return int(checked_percentage)
+
+
+# Partial index for the next_unchecked queue. SQLite won't accept bound
+# parameters in a partial index, so the state is inlined.
+Solution.add_index(
+    Solution.submission_timestamp,
+    name='solution_created_submission_timestamp',
+    where=SQL(f"state = '{Solution.STATES.CREATED.name}'"),
+)
 
 
 class SolutionFile(BaseModel):
     path = TextField(default='/main.py')
     solution = ForeignKeyField(Solution, backref='files')
     code = TextField()
-    file_hash = TextField()
+    file_hash = TextField(index=True)
 
     @classmethod
     def is_duplicate(
@@ -631,6 +799,12 @@ class SolutionFile(BaseModel):
         return ext if filename else ''
 
 
+@pre_save(sender=SolutionFile)
+def on_solution_file_save_handler(model_class, instance, created):
+    """Keep the hash of the code, used to find identical files, up to date."""
+    instance.file_hash = model_class.create_hash(instance.code)
+
+
 class SharedSolution(BaseModel):
     shared_url = TextField(primary_key=True, unique=True)
     solution = ForeignKeyField(Solution, backref='shared')
@@ -642,8 +816,7 @@ class SharedSolution(BaseModel):
         new_url = generate_string(
             min_len=10, max_len=11, allow_punctuation=False,
         )
-        exists = cls.get_or_none(cls.shared_url == new_url)
-        while exists is not None:
+        while cls.select().where(cls.shared_url == new_url).exists():
             log.debug(
                 f'Collision with creating link to {solution.id} solution, ',
                 'trying again.',
@@ -651,7 +824,6 @@ class SharedSolution(BaseModel):
             new_url = generate_string(
                 min_len=10, max_len=11, allow_punctuation=False,
             )
-            exists = cls.get_or_none(cls.shared_url == new_url)
 
         return cls.create(shared_url=new_url, solution=solution)
 
@@ -669,15 +841,14 @@ class ExerciseTest(BaseModel):
 
     @classmethod
     def get_or_create_exercise_test(cls, exercise: Exercise, code: str):
-        instance, created = cls.get_or_create(**{
+        cls.insert(**{
             cls.exercise.name: exercise,
-        }, defaults={
             cls.code.name: code,
-        })
-        if not created:
-            instance.code = code
-            instance.save()
-        return instance
+        }).on_conflict(
+            conflict_target=[cls.exercise],
+            update={cls.code: code},
+        ).execute()
+        return cls.get(cls.exercise == exercise)
 
     @classmethod
     def get_by_exercise(cls, exercise: Exercise):
@@ -692,9 +863,10 @@ class ExerciseTestName(BaseModel):
     test_name = TextField()
     pretty_test_name = TextField()
 
-    indexes = (
-        (('exercise_test', 'test_name'), True),
-    )
+    class Meta:
+        indexes = (
+            (('exercise_test', 'test_name'), True),
+        )
 
     @classmethod
     def create_exercise_test_name(
@@ -703,34 +875,80 @@ class ExerciseTestName(BaseModel):
         test_name: str,
         pretty_test_name: str,
     ):
-        instance, created = cls.get_or_create(**{
+        cls.insert(**{
             cls.exercise_test.name: exercise_test,
             cls.test_name.name: test_name,
-        }, defaults={
             cls.pretty_test_name.name: pretty_test_name,
-        })
-        if not created:
-            instance.pretty_test_name = pretty_test_name
-            instance.save()
+        }).on_conflict(
+            conflict_target=[cls.exercise_test, cls.test_name],
+            update={cls.pretty_test_name: pretty_test_name},
+        ).execute()
 
     @classmethod
-    def get_exercise_test(cls, exercise: Exercise, test_name: str):
+    def get_exercise_test(
+        cls,
+        exercise: Exercise,
+        test_name: str,
+        exercise_test: Optional[ExerciseTest] = None,
+    ):
+        if exercise_test is None:
+            exercise_test = ExerciseTest.get_by_exercise(exercise)
+
         if test_name == cls.FATAL_TEST_NAME:
             instance, _ = cls.get_or_create(**{
-                cls.exercise_test.name: ExerciseTest.get_by_exercise(exercise),
+                cls.exercise_test.name: exercise_test,
                 cls.test_name.name: test_name,
             }, defaults={
                 cls.pretty_test_name.name: cls.FATAL_TEST_PRETTY_TEST_NAME,
             })
             return instance
         instance, _ = cls.get_or_create(**{
-            cls.exercise_test.name: ExerciseTest.get_by_exercise(exercise),
+            cls.exercise_test.name: exercise_test,
             cls.test_name.name: test_name,
         }, defaults={
             cls.pretty_test_name.name: test_name,
         })
         return instance
 
+    @classmethod
+    def _ids_by_test_name(
+        cls, exercise_test: ExerciseTest, test_names: Iterable[str],
+    ) -> Dict[str, int]:
+        return dict(
+            cls
+            .select(cls.test_name, cls.id)
+            .where(
+                cls.exercise_test == exercise_test,
+                cls.test_name.in_(tuple(test_names)),
+            )
+            .tuples(),
+        )
+
+    @classmethod
+    def get_exercise_tests_ids(
+        cls,
+        exercise_test: ExerciseTest,
+        test_names: Iterable[str],
+    ) -> Dict[str, int]:
+        test_names = set(test_names)
+        ids = cls._ids_by_test_name(exercise_test, test_names)
+        missing = test_names - ids.keys()
+        if missing:
+            cls.insert_many([
+                {
+                    cls.exercise_test.name: exercise_test,
+                    cls.test_name.name: test_name,
+                    cls.pretty_test_name.name: (
+                        cls.FATAL_TEST_PRETTY_TEST_NAME
+                        if test_name == cls.FATAL_TEST_NAME
+                        else test_name
+                    ),
+                }
+                for test_name in missing
+            ]).on_conflict_ignore().execute()
+            ids.update(cls._ids_by_test_name(exercise_test, missing))
+        return ids
+
 
 class SolutionExerciseTestExecution(BaseModel):
     solution = ForeignKeyField(model=Solution)
@@ -745,10 +963,12 @@ class SolutionExerciseTestExecution(BaseModel):
         test_name: str,
         user_message: str,
         staff_message: str,
+        exercise_test: Optional[ExerciseTest] = None,
     ):
         exercise_test_name = ExerciseTestName.get_exercise_test(
             exercise=solution.exercise,
             test_name=test_name,
+            exercise_test=exercise_test,
         )
         cls.create(**{
             cls.solution.name: solution,
@@ -757,6 +977,35 @@ class SolutionExerciseTestExecution(BaseModel):
             cls.staff_message.name: staff_message,
         })
 
+    @classmethod
+    def create_many(
+        cls,
+        solution: Solution,
+        results: Iterable[Tuple[str, str, str]],
+        exercise_test: Optional[ExerciseTest] = None,
+    ) -> None:
+        """Store (test_name, user_message, staff_message) results at once."""
+        results = tuple(results)
+        if not results:
+            return
+
+        if exercise_test is None:
+            exercise_test = ExerciseTest.get_by_exercise(solution.exercise)
+
+        with cls._meta.database.atomic():
+            test_names_ids = ExerciseTestName.get_exercise_tests_ids(
+                exercise_test, (test_name for test_name, _, _ in results),
+            )
+            cls.insert_many([
+                {
+                    cls.solution.name: solution,
+                    cls.exercise_test_name.name: test_names_ids[test_name],
+                    cls.user_message.name: user_message,
+                    cls.staff_message.name: staff_message,
+                }
+                for test_name, user_message, staff_message in results
+            ]).execute()
+
     @classmethod
     def by_solution(cls, solution: Solution) -> Iterable[dict]:
         return cls.filter(
@@ -783,6 +1032,14 @@ class CommentText(BaseModel):
         return instance
 
 
+# Partial index for the common comments, which skip the flake8 texts.
+CommentText.add_index(
+    CommentText.id,
+    name='commenttext_without_flake8_key',
+    where=SQL('flake8_key IS NULL'),
+)
+
+
 class Note(BaseModel):
     creator = ForeignKeyField(User)
     user = ForeignKeyField(User)
@@ -834,9 +1091,18 @@ class Comment(BaseModel):
             cls,
             solution: Solution,
     ) -> Union[Iterable['Comment'], 'Comment']:
-        return cls.select().join(
-            SolutionFile,
-        ).filter(SolutionFile.solution == solution)
+        # The comment text and the commenter are selected along with the
+        # comment, so reading them from the rows won't query them again.
+        return (
+            cls
+            .select(cls, CommentText, User)
+            .join(SolutionFile)
+            .switch()
+            .join(CommentText)
+            .switch()
+            .join(User)
+            .where(SolutionFile.solution == solution)
+        )
 
     @property
     def solution(self) -> Solution:
@@ -864,15 +1130,13 @@ class Comment(BaseModel):
         fields = (
             cls.id, cls.line_number, cls.is_auto,
             CommentText.id.alias('comment_id'), CommentText.text,
-            SolutionFile.id.alias('file_id'),
+            cls.file.alias('file_id'),
             User.fullname.alias('author_name'),
             User.role.alias('author_role'),
         )
         return (
             cls
             .select(*fields)
-            .join(SolutionFile)
-            .switch()
             .join(CommentText)
             .switch()
             .join(User)
@@ -885,18 +1149,20 @@ class Comment(BaseModel):
         return tuple(cls._by_file(file_id).dicts())
 
 
+_RANDOMIZER = secrets.SystemRandom()
+_PUNCTUATED_CHARACTERS = string.printable[:66]
+_ALPHANUMERIC_CHARACTERS = string.ascii_letters + string.digits
+
+
 def generate_string(
     min_len: int = 9, max_len: int = 16, allow_punctuation: bool = True,
 ) -> str:
-    randomizer = secrets.SystemRandom()
-    length = randomizer.randrange(min_len, max_len)
+    length = _RANDOMIZER.randrange(min_len, max_len)
     if allow_punctuation:
-        password = randomizer.choices(string.printable[:66], k=length)
+        characters = _PUNCTUATED_CHARACTERS
     else:
-        password = randomizer.choices(
-            string.ascii_letters + string.digits, k=length,
-        )
-    return ''.join(password)
+        characters = _ALPHANUMERIC_CHARACTERS
+    return ''.join(_RANDOMIZER.choices(characters, k=length))
 
 
 def create_demo_users():
@@ -918,8 +1184,9 @@ def create_demo_users():
 
 
 def create_basic_roles():
+    _ROLES_CACHE.clear()
     for role in RoleOptions:
         Role.create(name=role.value)
 
 
-ALL_MODELS = BaseModel.__subclasses__()
+ALL_MODELS = tuple(BaseModel.__subclasses__())
@@ -1,6 +1,7 @@
 from lms.lmstests.public.config import celery as celery_config
 from lms.lmstests.public.linters import tasks as flake8_tasks
 from lms.lmstests.public.identical_tests import tasks as identical_tests_tasks
+from lms.lmstests.public.mails import tasks as mails_tasks
 from lms.lmstests.public.unittests import tasks as unittests_tasks
 from lms.lmstests.public.general import tasks as general_tasks
 
@@ -12,5 +13,6 @@ __all__ = (
     'celery_app',
     'identical_tests_tasks',
     'general_tasks',
+    'mails_tasks',
     'unittests_tasks',
 )
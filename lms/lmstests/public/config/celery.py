@@ -21,4 +21,11 @@ app.conf.update(
     result_serializer='json',
     enable_utc=True,
     task_always_eager=bool(os.getenv('FLASK_DEBUG')),
+    # Each kind of work has its own queue, so workers can be started per
+    # queue (celery worker -Q <queue>) and a slow kind won't hold the others.
+    task_routes={
+        'lms.lmstests.public.linters.tasks.*': {'queue': 'linters'},
+        'lms.lmstests.public.unittests.tasks.*': {'queue': 'unittests'},
+        'lms.lmstests.public.mails.tasks.*': {'queue': 'mails'},
+    },
 )
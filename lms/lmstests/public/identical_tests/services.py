@@ -51,26 +51,35 @@ class IdenticalSolutionSolver:
     def _get_first_identical_solution_file(
             self,
     ) -> typing.Optional[models.SolutionFile]:
-        match_code = self.solution.solution_files.get().code
+        match_file = self.solution.solution_files.get()
         return models.SolutionFile.select().join(
             models.Solution,
         ).filter(
             models.Solution.exercise == self.solution.exercise,
             models.Solution.state == models.Solution.STATES.DONE.name,
-            models.SolutionFile.code == match_code,
+            *self._same_code_as(match_file),
         ).first()
 
+    @staticmethod
+    def _same_code_as(solution_file: models.SolutionFile):
+        # The indexed hash narrows down the files, and comparing the code
+        # itself keeps a hash collision from matching.
+        return (
+            models.SolutionFile.file_hash == solution_file.file_hash,
+            models.SolutionFile.code == solution_file.code,
+        )
+
     def check_for_match_solutions_to_solve(self):
         if self.solution.solution_files.count() != 1:
             return
 
-        match_code = self.solution.solution_files.get().code
+        match_file = self.solution.solution_files.get()
         for solution_file in models.SolutionFile.select().join(
                 models.Solution,
         ).filter(
             models.Solution.exercise == self.solution.exercise,
             models.Solution.state == models.Solution.STATES.CREATED.name,
-            models.SolutionFile.code == match_code,
+            *self._same_code_as(match_file),
         ):
             self._clone_solution_comments(
                 from_solution=self.solution,
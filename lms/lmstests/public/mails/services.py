@@ -0,0 +1,58 @@
+import re
+
+from flask_babel import gettext as _  # type: ignore
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from lms.lmsweb import config
+from lms.utils.log import log
+
+
+_TEMPLATE_PLACEHOLDER = re.compile(r'@@(\w+)@@')
+
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.2),
+))
+
+
+def build_registration_text(email: str, password: str) -> str:
+    details = {
+        'username': email,
+        'password': password,
+        'url': config.SERVER_ADDRESS,
+    }
+    return _TEMPLATE_PLACEHOLDER.sub(
+        lambda match: details.get(match.group(1), match.group(0)),
+        config.MAIL_WELCOME_MESSAGE,
+    )
+
+
+def send_registration_email(email: str, password: str) -> None:
+    response = None
+    text = build_registration_text(email, password)
+    url = f'https://api.eu.mailgun.net/v3/{config.MAILGUN_DOMAIN}/messages'
+    try:
+        response = _session.post(
+            url=url,
+            data={
+                'from': f'lms@{config.MAILGUN_DOMAIN}',
+                'to': email,
+                'subject': (
+                    'Learn Python - ',
+                    _('מערכת הגשת התרגילים'),
+                ),
+                'html': text,
+            },
+            auth=('api', config.MAILGUN_API_KEY))
+        response.raise_for_status()
+    except Exception:
+        log.exception(
+            'Failed to create user %s. response: %s',
+            email,
+            response.content if response is not None else None,
+        )
+        raise
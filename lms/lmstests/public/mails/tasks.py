@@ -0,0 +1,17 @@
+import logging
+
+from celery.utils.log import get_task_logger
+
+from lms.lmstests.public.config.celery import app
+from lms.lmstests.public.mails import services
+
+
+_logger: logging.Logger = get_task_logger(__name__)
+_logger.setLevel(logging.INFO)
+
+
+# Nobody waits for the sends, so a failed send is only logged by the worker.
+@app.task(ignore_result=True)
+def send_registration_email(email: str, password: str) -> None:
+    _logger.info('Start send_registration_email to %s', email)
+    services.send_registration_email(email, password)
@@ -83,7 +83,7 @@ class DockerExecutor(BaseExecutor):
             docker_path = f'{self._container_name}:{container_path}'
             args = ('docker', 'cp', docker_path, temp_file.name)
             subprocess.check_output(args)  # NOQA: S603
-            with open(temp_file.name, 'r') as file_reader:
+            with open(temp_file.name, 'rb') as file_reader:
                 content = file_reader.read()
         return content
 
@@ -108,7 +108,7 @@ class SameProcessExecutor(BaseExecutor):
         open(os.path.join(self._cwd, file_path), 'w').write(content)
 
     def get_file(self, file_path: str):
-        return open(os.path.join(self._cwd, file_path), 'r').read()
+        return open(os.path.join(self._cwd, file_path), 'rb').read()
 
 
 __MAPPING = {
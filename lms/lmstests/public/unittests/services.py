@@ -1,8 +1,10 @@
+import io
 import logging
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+from xml.etree import ElementTree  # noqa: S405
 
+from defusedxml import ElementTree as SafeElementTree
 from flask_babel import gettext as _  # type: ignore
-import junitparser
 
 from lms.lmsdb import models
 from lms.lmstests.public.unittests import executers
@@ -11,6 +13,9 @@ from lms.models import notifications
 
 
 class UnitTestChecker:
+    RESULT_TAGS = frozenset(('failure', 'error', 'skipped'))
+    DROP_NEWLINES = str.maketrans('', '', '\n\r')
+
     def __init__(
             self,
             logger: logging.Logger,
@@ -52,6 +57,8 @@ class UnitTestChecker:
                     args=(
                         'pytest',
                         executor.get_file_path(python_file),
+                        '-p', 'no:cacheprovider',
+                        '-q',
                         '--junitxml',
                         executor.get_file_path(test_output_path)),
                 )
@@ -72,19 +79,36 @@ class UnitTestChecker:
         test_code = self._exercise_auto_test.code
         return f'{test_code}\n\n{user_code}'
 
-    def _populate_junit_results(self, raw_results: str) -> None:
+    def _populate_junit_results(self, raw_results: Optional[bytes]) -> None:
         assert self._solution is not None  # noqa: S101
-        suites = ()
-        if raw_results:
-            suites = junitparser.TestSuite.fromstring(raw_results).testsuites()
-
         tests_ran = False
-        number_of_failures = 0
-        for test_suite in suites:
-            failures, ran = self._handle_test_suite(test_suite)
-            number_of_failures += failures
-            if ran and not tests_ran:
-                tests_ran = ran
+        failed_results = []
+        if raw_results:
+            # Parse the report case by case and detach every processed case
+            # from its parent, so a huge report isn't held in memory as a
+            # whole tree.
+            report = io.BytesIO(raw_results)
+            parents: List[ElementTree.Element] = []
+            for event, element in SafeElementTree.iterparse(
+                report, events=('start', 'end'),
+            ):
+                if event == 'start':
+                    parents.append(element)
+                    continue
+                parents.pop()
+                if element.tag != 'testcase':
+                    continue
+                tests_ran = True
+                self._handle_test_case(element, failed_results)
+                if parents:
+                    parents[-1].remove(element)
+
+        models.SolutionExerciseTestExecution.create_many(
+            solution=self._solution,
+            results=failed_results,
+            exercise_test=self._exercise_auto_test,
+        )
+        number_of_failures = len(failed_results)
 
         if not tests_ran:
             self._handle_failed_to_execute_tests(raw_results)
@@ -106,7 +130,9 @@ class UnitTestChecker:
             action_url=f'{routes.SOLUTIONS}/{self._solution_id}',
         )
 
-    def _handle_failed_to_execute_tests(self, raw_results: str) -> None:
+    def _handle_failed_to_execute_tests(
+            self, raw_results: Optional[bytes],
+    ) -> None:
         self._logger.info('junit invalid results (%s) on solution %s',
                           raw_results, self._solution_id)
         fail_user_message = _(
@@ -117,6 +143,7 @@ class UnitTestChecker:
             test_name=models.ExerciseTestName.FATAL_TEST_NAME,
             user_message=fail_user_message,
             staff_message=_('אחי, בדקת את הקוד שלך?'),
+            exercise_test=self._exercise_auto_test,
         )
         notifications.send(
             kind=notifications.NotificationKind.UNITTEST_ERROR,
@@ -126,33 +153,27 @@ class UnitTestChecker:
             action_url=f'{routes.SOLUTIONS}/{self._solution_id}',
         )
 
-    def _handle_test_suite(
+    def _handle_test_case(
             self,
-            test_suite: junitparser.TestSuite,
-    ) -> Tuple[int, bool]:
-        number_of_failures = 0
-        tests_ran = False
-        for case in test_suite:
-            tests_ran = True
-            result: junitparser.Element = case.result
-            if result is None:
-                self._logger.info(
-                    'Case %s passed for solution %s.',
-                    case.name, self._solution,
-                )
-                continue
-            # invalid case
-            message = ' '.join([
-                elem[1].replace('\n', '')
-                for elem in result._elem.items()
-            ])
-            self._logger.info('Create comment on test %s solution %s.',
-                              case.name, self._solution_id)
-            number_of_failures += 1
-            models.SolutionExerciseTestExecution.create_execution_result(
-                solution=self._solution,
-                test_name=case.name,
-                user_message=message,
-                staff_message=result._elem.text,
+            case: ElementTree.Element,
+            failed_results: List[Tuple[str, str, Optional[str]]],
+    ) -> None:
+        case_name = case.get('name')
+        result = next(
+            (child for child in case if child.tag in self.RESULT_TAGS),
+            None,
+        )
+        if result is None:
+            self._logger.info(
+                'Case %s passed for solution %s.',
+                case_name, self._solution_id,
             )
-        return number_of_failures, tests_ran
+            return
+        # invalid case
+        message = ' '.join(
+            value.translate(self.DROP_NEWLINES)
+            for value in result.attrib.values()
+        )
+        self._logger.info('Create comment on test %s solution %s.',
+                          case_name, self._solution_id)
+        failed_results.append((case_name, message, result.text))
@@ -6,6 +6,7 @@ from flask_babel import Babel  # type: ignore
 from flask_limiter import Limiter  # type: ignore
 from flask_limiter.util import get_remote_address  # type: ignore
 from flask_wtf.csrf import CSRFProtect  # type: ignore
+from jinja2 import FileSystemBytecodeCache
 
 from lms.utils import config_migrator, debug
 
@@ -42,6 +43,23 @@ csrf = CSRFProtect(webapp)
 babel = Babel(webapp)
 
 
+class _LazyFileSystemBytecodeCache(FileSystemBytecodeCache):
+    """Creates the cache directory only when a template is first compiled."""
+
+    def dump_bytecode(self, bucket):
+        pathlib.Path(self.directory).mkdir(parents=True, exist_ok=True)
+        super().dump_bytecode(bucket)
+
+
+# Compiled templates are shared between the workers and their restarts.
+# Templates are edited while debugging, so there they are always reloaded.
+if not (webapp.debug or webapp.testing):
+    webapp.jinja_env.bytecode_cache = _LazyFileSystemBytecodeCache(
+        str(pathlib.Path(webapp.instance_path) / 'jinja_cache'),
+    )
+    webapp.jinja_env.auto_reload = False
+
+
 # Must import files after app's creation
 from lms.lmsdb import models  # NOQA: F401, E402, I202
 from lms.lmsweb import views  # NOQA: F401, E402
@@ -1,5 +1,6 @@
 from functools import wraps
 
+from flask import current_app
 from flask_admin import Admin, AdminIndexView  # type: ignore
 from flask_admin.contrib.peewee import ModelView  # type: ignore
 from flask_login import current_user  # type: ignore
@@ -13,6 +14,9 @@ def managers_only(func):
     # Must have @wraps to work with endpoints.
     @wraps(func)
     def wrapper(*args, **kwargs):
+        # Checks the login too, so the endpoints don't need @login_required.
+        if not current_user.is_authenticated:
+            return current_app.login_manager.unauthorized()
         if not current_user.role.is_manager:
             return fail(403, 'This user has no permissions to view this page.')
         else:
@@ -42,7 +46,7 @@ class AdminSolutionView(AdminModelView):
         Solution.state.name,
     )
     column_choices = {
-        Solution.state.name: Solution.STATES.to_choices(),
+        Solution.state.name: Solution.STATES.CHOICES,
     }
 
 
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Optional
 from urllib.parse import urljoin, urlparse
 
@@ -21,12 +22,32 @@ PERMISSIVE_CORS = {
 }
 
 
+@lru_cache(maxsize=4)
+def _get_netloc(host_url: str) -> str:
+    return urlparse(host_url).netloc
+
+
+def _has_control_characters(target: str) -> bool:
+    # urlsplit drops tabs and newlines, so '/\t/evil.com' would turn into a
+    # link to another host.
+    return any(c < ' ' or c == '\x7f' for c in target)
+
+
 def is_safe_url(target):
-    ref_url = urlparse(request.host_url)
-    test_url = urlparse(urljoin(request.host_url, target))
+    # No target means the default page, and a path on this host is always
+    # ours; only other targets need to be parsed.
+    if not target:
+        return True
+    if _has_control_characters(target):
+        return False
+    if target.startswith('/') and not target.startswith(('//', '/\\')):
+        return True
+
+    # Browsers read backslashes as slashes, so '/\evil.com' is another host.
+    test_url = urlparse(urljoin(request.host_url, target.replace('\\', '/')))
     return (
         test_url.scheme in ('http', 'https')
-        and ref_url.netloc == test_url.netloc
+        and _get_netloc(request.host_url) == test_url.netloc
     )
 
 
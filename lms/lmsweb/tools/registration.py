@@ -2,14 +2,14 @@ import csv
 import os
 import typing
 
-from flask_babel import gettext as _  # type: ignore
+from celery import group
+from peewee import IntegrityError
 
 from lms.lmsdb import models
+from lms.lmstests.public.mails import tasks as mails_tasks
 from lms.lmsweb import config
 from lms.utils.log import log
 
-import requests
-
 
 class UserToCreate(typing.NamedTuple):
     name: str
@@ -25,8 +25,6 @@ class UserToCreate(typing.NamedTuple):
 
 
 class UserRegistrationCreator:
-    _session = requests.Session()
-
     def __init__(self, users_to_create: typing.Sequence[UserToCreate]):
         self._users_to_create = users_to_create
         self._failed_users: typing.List[UserToCreate] = []
@@ -67,66 +65,70 @@ class UserRegistrationCreator:
                 writer.writerow(failed_user.to_dict())
 
     def run_registration(self):
-        for user in self._users_to_create:
-            try:
-                self._get_or_create_user_in_model(user)
-                self._send_user_email_registration(user)
-            except Exception:
-                log.exception(
-                    'Failed to create user %s, continue to next user',
-                    user.email,
-                )
-                self._failed_users.append(user)
-
-    @staticmethod
-    def _get_or_create_user_in_model(user: UserToCreate) -> None:
-        log.info('Create user with email: %s', user.email)
-        models.User.get_or_create(**{
-            models.User.mail_address.name: user.email,
-            models.User.username.name: user.email,
-        }, defaults={
-            models.User.fullname.name: f'{user.name}',
-            models.User.role.name: models.Role.get_student_role(),
-            models.User.password.name: user.password,
-        })
-
-    def _send_user_email_registration(self, user: UserToCreate) -> None:
-        response = None
-        text = self._build_user_text(user)
-        url = f'https://api.eu.mailgun.net/v3/{config.MAILGUN_DOMAIN}/messages'
         try:
-            response = self._session.post(
-                url=url,
-                data={
-                    'from': f'lms@{config.MAILGUN_DOMAIN}',
-                    'to': user,
-                    'subject': (
-                        'Learn Python - ',
-                        _('מערכת הגשת התרגילים'),
-                    ),
-                    'html': text,
-                },
-                auth=('api', config.MAILGUN_API_KEY))
-            response.raise_for_status()
+            created_users = self._create_users_in_model()
         except Exception:
-            log.exception(
-                'Failed to create user %s. response: %s',
-                user.email,
-                response.content,
+            log.exception('Failed to create the users')
+            self._failed_users.extend(self._users_to_create)
+            return
+
+        # The emails are sent by the workers, so the import doesn't wait
+        # for a mail API round-trip per user. The workers log failed sends.
+        group(
+            mails_tasks.send_registration_email.s(user.email, user.password)
+            for user in created_users
+        ).apply_async()
+
+    def _create_users_in_model(self) -> typing.List[UserToCreate]:
+        users = {user.email: user for user in self._users_to_create}
+        existing_emails = {
+            user.mail_address
+            for user in models.User.select(models.User.mail_address).where(
+                models.User.mail_address.in_(list(users)),
             )
-            raise
-
-    @staticmethod
-    def _build_user_text(user: UserToCreate) -> str:
-        details = {
-            'username': user.email,
-            'password': user.password,
-            'url': config.SERVER_ADDRESS,
         }
-        msg = config.MAIL_WELCOME_MESSAGE
-        for k, v in details.items():
-            msg = msg.replace(f'@@{k}@@', v)
-        return msg
+        for email in existing_emails:
+            log.info('User %s is already registered, skipping', email)
+        student_role = models.Role.get_student_role()
+        new_users = {
+            email: {
+                models.User.mail_address.name: user.email,
+                models.User.username.name: user.email,
+                models.User.fullname.name: f'{user.name}',
+                models.User.role.name: student_role,
+                models.User.password.name: (
+                    models.User.hash_secret(user.password)
+                ),
+                models.User.api_key.name: models.User.hash_secret(
+                    models.User.random_password(),
+                ),
+            }
+            for email, user in users.items()
+            if email not in existing_emails
+        }
+        log.info('Create %d new users', len(new_users))
+        if not new_users:
+            return []
+
+        try:
+            with models.User._meta.database.atomic():
+                models.User.insert_many(list(new_users.values())).execute()
+        except IntegrityError:
+            log.exception('Failed to create the users at once, one by one')
+        else:
+            return [users[email] for email in new_users]
+
+        created_users = []
+        for email, row in new_users.items():
+            try:
+                with models.User._meta.database.atomic():
+                    models.User.insert(row).execute()
+            except IntegrityError:
+                log.exception('Failed to create user %s', email)
+                self._failed_users.append(users[email])
+            else:
+                created_users.append(users[email])
+        return created_users
 
 
 if __name__ == '__main__':
@@ -2,7 +2,7 @@ from typing import Any, Callable, Optional
 
 import arrow  # type: ignore
 from flask import (
-    jsonify, make_response, render_template,
+    Response, jsonify, make_response, render_template,
     request, send_from_directory, url_for,
 )
 from flask_limiter.util import get_remote_address  # type: ignore
@@ -13,7 +13,7 @@ from werkzeug.datastructures import FileStorage
 from werkzeug.utils import redirect
 
 from lms.lmsdb.models import (
-    ALL_MODELS, Comment, Note, RoleOptions, SharedSolution,
+    ALL_MODELS, Comment, Note, Role, SharedSolution,
     Solution, SolutionFile, User, database,
 )
 from lms.lmsweb import babel, limiter, routes, webapp
@@ -37,37 +37,43 @@ from lms.utils.files import (
 )
 from lms.utils.log import log
 
-HIGH_ROLES = {str(RoleOptions.STAFF), str(RoleOptions.ADMINISTRATOR)}
+# The locale is set in the configuration, so it's resolved only once.
+SELECTED_LOCALE = LOCALE if LOCALE in LANGUAGES else 'en'
+DIRECTION = 'rtl' if SELECTED_LOCALE in RTL_LANGUAGES else 'ltr'
 
 
 @babel.localeselector
 def get_locale():
-    if LOCALE in LANGUAGES:
-        return LOCALE
-    return 'en'
+    return SELECTED_LOCALE
 
 
 @webapp.before_request
 def _db_connect():
-    database.connect()
+    database.connect(reuse_if_open=True)
 
 
 @webapp.after_request
 def after_request(response):
-    for name, value in PERMISSIVE_CORS.items():
-        response.headers.add(name, value)
+    response.headers.extend(PERMISSIVE_CORS)
     return response
 
 
 @webapp.teardown_request
 def _db_close(exc):
-    if not database.is_closed():
-        database.close()
+    # Hands a pooled connection back to the pool; a no-op when closed.
+    database.close()
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.get_or_none(id=user_id)
+    # The role is checked on nearly every request, so load it along.
+    return (
+        User
+        .select(User, Role)
+        .join(Role)
+        .where(User.id == user_id)
+        .first()
+    )
 
 
 @webapp.errorhandler(429)
@@ -162,7 +168,6 @@ def main():
 
 @webapp.route(routes.STATUS)
 @managers_only
-@login_required
 def status():
     return render_template(
         'status.html',
@@ -173,7 +178,9 @@ def status():
 @webapp.route('/exercises')
 @login_required
 def exercises_page():
-    fetch_archived = bool(request.args.get('archived'))
+    fetch_archived = (
+        request.args.get('archived', '').lower() in ('1', 'true', 'yes')
+    )
     exercises = Solution.of_user(current_user.id, fetch_archived)
     is_manager = current_user.role.is_manager
     return render_template(
@@ -261,18 +268,25 @@ def note(user_id: int):
 @webapp.route('/comments', methods=['GET', 'POST'])
 @login_required
 def comment():
-    act = request.args.get('act') or request.json.get('act')
+    body = request.get_json(silent=True) or {}
+    act = request.args.get('act') or body.get('act')
 
     if request.method == 'POST':
-        file_id = int(request.json.get('fileId', 0))
+        file_id = int(body.get('fileId', 0))
     else:  # it's a GET
         file_id = int(request.args.get('fileId', 0))
 
-    file = SolutionFile.get_or_none(file_id)
+    file = (
+        SolutionFile
+        .select(SolutionFile, Solution)
+        .join(Solution)
+        .where(SolutionFile.id == file_id)
+        .first()
+    )
     if file is None:
         return fail(404, f'No such file {file_id}.')
 
-    solver_id = file.solution.solver.id
+    solver_id = file.solution.solver_id
     if solver_id != current_user.id and not current_user.role.is_manager:
         return fail(403, "You aren't allowed to access this page.")
 
@@ -289,7 +303,7 @@ def comment():
         return try_or_fail(comments.delete)
 
     if act == 'create':
-        user = User.get_or_none(User.id == current_user.id)
+        user = current_user._get_current_object()
         try:
             comment_ = comments.create(file=file, user=user)
         except LmsError as e:
@@ -340,11 +354,7 @@ def send_():
 @webapp.route('/upload', methods=['POST'])
 @login_required
 def upload_page():
-    user_id = current_user.id
-    user = User.get_or_none(User.id == user_id)  # should never happen
-    if user is None:
-        return fail(404, 'User not found.')
-    if request.content_length > MAX_UPLOAD_SIZE:
+    if (request.content_length or 0) > MAX_UPLOAD_SIZE:
         return fail(
             413, f'File is too big. {MAX_UPLOAD_SIZE // 1000000}MB allowed.',
         )
@@ -353,6 +363,7 @@ def upload_page():
     if file is None:
         return fail(422, 'No file was given.')
 
+    user = current_user._get_current_object()
     try:
         matches, misses = upload.new(user, file)
     except UploadError as e:
@@ -383,7 +394,7 @@ def download(download_id: str):
         error_message, status_code = e.args
         return fail(status_code, error_message)
 
-    response = make_response(solutions.create_zip_from_solution(files))
+    response = Response(solutions.create_zip_from_solution(files))
     response.headers.set('Content-Type', 'zip')
     response.headers.set(
         'Content-Disposition', 'attachment',
@@ -398,11 +409,11 @@ def download(download_id: str):
 def view(
     solution_id: int, file_id: Optional[int] = None, shared_url: str = '',
 ):
-    solution = Solution.get_or_none(Solution.id == solution_id)
+    solution = Solution.get_with_details(solution_id)
     if solution is None:
         return fail(404, 'Solution does not exist.')
 
-    viewer_is_solver = solution.solver.id == current_user.id
+    viewer_is_solver = solution.solver_id == current_user.id
     has_viewer_access = current_user.role.is_viewer
     if not shared_url and not viewer_is_solver and not has_viewer_access:
         return fail(403, 'This user has no permissions to view this page.')
@@ -442,14 +453,13 @@ def shared_solution(shared_url: str, file_id: Optional[int] = None):
         return fail(404, 'The solution does not exist.')
 
     share_link.new(shared_solution)
-    solution_id = shared_solution.solution.id
+    solution_id = shared_solution.solution_id
     return view(
         solution_id=solution_id, file_id=file_id, shared_url=shared_url,
     )
 
 
 @webapp.route('/checked/<int:exercise_id>/<int:solution_id>', methods=['POST'])
-@login_required
 @managers_only
 def done_checking(exercise_id, solution_id):
     is_updated = solutions.mark_as_checked(solution_id, current_user.id)
@@ -459,7 +469,6 @@ def done_checking(exercise_id, solution_id):
 
 
 @webapp.route('/check/<int:exercise_id>')
-@login_required
 @managers_only
 def start_checking(exercise_id):
     next_solution = solutions.get_next_unchecked(exercise_id)
@@ -470,7 +479,6 @@ def start_checking(exercise_id):
 
 @webapp.route('/common_comments')
 @webapp.route('/common_comments/<exercise_id>')
-@login_required
 @managers_only
 def common_comments(exercise_id=None):
     return jsonify(comments._common_comments(exercise_id=exercise_id))
@@ -501,8 +509,5 @@ def _jinja2_filter_path_to_mime_type(filename: str) -> str:
     return get_mime_type_by_extention(ext)
 
 
-DIRECTION = 'rtl' if get_locale() in RTL_LANGUAGES else 'ltr'
-
-
 for m in ALL_MODELS:
     admin.add_view(SPECIAL_MAPPING.get(m, AdminModelView)(m))
@@ -1,4 +1,5 @@
-from typing import Optional
+import time
+from typing import Any, Dict, Optional, Tuple
 
 from flask import request
 from flask_login import current_user  # type: ignore
@@ -14,6 +15,17 @@ from lms.models.errors import (
 )
 
 
+COMMON_COMMENTS_TTL_SECONDS = 60
+_COMMON_COMMENTS_CACHE: Dict[
+    Tuple[Optional[int], Optional[int]],
+    Tuple[float, Tuple[Dict[str, Any], ...]],
+] = {}
+
+
+def clear_common_comments_cache() -> None:
+    _COMMON_COMMENTS_CACHE.clear()
+
+
 def _create_comment(
     user: User,
     file: SolutionFile,
@@ -44,39 +56,43 @@ def _create_comment(
 
     solutions.notify_comment_after_check(user, file.solution)
 
-    return Comment.create(
+    comment = Comment.create(
         commenter=user,
         line_number=line_number,
         comment=new_comment_id,
         file=file,
     )
+    clear_common_comments_cache()
+    return comment
 
 
 def delete():
     comment_id = int(request.args.get('commentId'))
-    comment_ = Comment.get_or_none(Comment.id == comment_id)
-    if (
-        comment_.commenter.id != current_user.id
-        and not current_user.role.is_manager
-    ):
+    # The permission check is part of the DELETE, so an allowed deletion
+    # takes one query.
+    is_deletable = Comment.id == comment_id
+    if not current_user.role.is_manager:
+        is_deletable &= Comment.commenter == current_user.id
+    if Comment.delete().where(is_deletable).execute():
+        clear_common_comments_cache()
+    elif Comment.select().where(Comment.id == comment_id).exists():
         raise ForbiddenPermission(
             "You aren't allowed to access this page.", 403,
         )
-    if comment_ is not None:
-        comment_.delete_instance()
 
 
 def create(file: SolutionFile, user: User):
-    kind = request.json.get('kind', '')
+    body = request.get_json(silent=True) or {}
+    kind = body.get('kind', '')
     comment_id, comment_text = None, None
     try:
-        line_number = int(request.json.get('line', 0))
+        line_number = int(body.get('line', 0))
     except ValueError:
         line_number = 0
     if kind.lower() == 'id':
-        comment_id = int(request.json.get('comment', 0))
+        comment_id = int(body.get('comment', 0))
     if kind.lower() == 'text':
-        comment_text = request.json.get('comment', '')
+        comment_text = body.get('comment', '')
     return _create_comment(
         user,
         file,
@@ -91,7 +107,21 @@ def _common_comments(exercise_id=None, user_id=None):
     """
     Most common comments throughout all exercises.
     Filter by exercise id when specified.
+    The results are cached per process for COMMON_COMMENTS_TTL_SECONDS.
+    Creating or deleting a comment clears only the cache of the process that
+    did it, so comments added by the Celery workers or by another web worker
+    may be missing from the results for up to COMMON_COMMENTS_TTL_SECONDS.
     """
+    try:
+        exercise_id = int(exercise_id) if exercise_id is not None else None
+        user_id = int(user_id) if user_id is not None else None
+    except ValueError:
+        return ()
+    key = (exercise_id, user_id)
+    cached = _COMMON_COMMENTS_CACHE.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
     is_moderator_comments = (
         (Comment.commenter.role == Role.get_staff_role().id)
         | (Comment.commenter.role == Role.get_admin_role().id),
@@ -126,4 +156,7 @@ def _common_comments(exercise_id=None, user_id=None):
         .limit(5)
     )
 
-    return tuple(query.dicts())
+    results = tuple(query.dicts())
+    expires_at = time.monotonic() + COMMON_COMMENTS_TTL_SECONDS
+    _COMMON_COMMENTS_CACHE[key] = (expires_at, results)
+    return results
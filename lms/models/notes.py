@@ -1,17 +1,21 @@
 from flask_login import current_user
 
-from lms.lmsdb.models import CommentText, Exercise, Note, User
+from lms.lmsdb.models import CommentText, Exercise, Note, NotePrivacy, User
 from lms.models.errors import ForbiddenPermission, UnprocessableRequest
 
 
 def delete(note_id: int):
-    note_ = Note.get_or_none(Note.id == note_id)
-    if note_.creator.id != current_user.id and note_.is_private:
+    # The permission check is part of the DELETE, so an allowed deletion
+    # takes one query.
+    is_deletable = (Note.id == note_id) & (
+        (Note.creator == current_user.id)
+        | (Note.privacy != NotePrivacy.PRIVATE.value)
+    )
+    is_deleted = Note.delete().where(is_deletable).execute()
+    if not is_deleted and Note.select().where(Note.id == note_id).exists():
         raise ForbiddenPermission(
             "You aren't allowed to access this page.", 403,
         )
-    if note_ is not None:
-        note_.delete_instance()
 
 
 def create(
@@ -22,7 +26,7 @@ def create(
     new_note_id = CommentText.create_comment(text=note_text).id
 
     Note.create(
-        creator=User.get_or_none(User.id == current_user.id),
+        creator=current_user._get_current_object(),
         user=user,
         note=new_note_id,
         exercise=Exercise.get_or_none(Exercise.subject == note_exercise),
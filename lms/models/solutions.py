@@ -1,11 +1,9 @@
-from io import BytesIO
 import os
 from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from zipfile import ZipFile
 
 from flask_babel import gettext as _  # type: ignore
 from flask_login import current_user  # type: ignore
-from playhouse.shortcuts import model_to_dict  # type: ignore
 
 from lms.extractors.base import File
 from lms.lmsdb.models import SharedSolution, Solution, SolutionFile, User
@@ -100,6 +98,21 @@ def start_checking(solution: Optional[Solution]) -> bool:
     return False
 
 
+def _solution_to_view_dict(solution: Solution) -> Dict[str, Any]:
+    return {
+        'id': solution.id,
+        'state': solution.state,
+        'exercise': {
+            'id': solution.exercise.id,
+            'subject': solution.exercise.subject,
+        },
+        'solver': {
+            'id': solution.solver.id,
+            'fullname': solution.solver.fullname,
+        },
+    }
+
+
 def get_view_parameters(
     solution: Solution, file_id: Optional[int], shared_url: str,
     is_manager: bool, solution_files: Tuple[SolutionFile, ...],
@@ -107,14 +120,15 @@ def get_view_parameters(
 ) -> Dict[str, Any]:
     versions = solution.ordered_versions()
     test_results = solution.test_results()
-    files = get_files_tree(solution.files)
+    files = get_files_tree(solution_files)
     file_id = file_id or (files[0]['id'] if files else None)
-    file_to_show = next((f for f in solution_files if f.id == file_id), None)
+    files_by_id = {f.id: f for f in solution_files}
+    file_to_show = files_by_id.get(file_id)
     if file_to_show is None:
         raise ResourceNotFound('File does not exist.', 404)
 
     view_params = {
-        'solution': model_to_dict(solution),
+        'solution': _solution_to_view_dict(solution),
         'files': files,
         'comments': solution.comments_per_file,
         'current_file': file_to_show,
@@ -130,7 +144,7 @@ def get_view_parameters(
         view_params = {
             **view_params,
             'exercise_common_comments':
-                comments._common_comments(exercise_id=solution.exercise),
+                comments._common_comments(exercise_id=solution.exercise_id),
             'all_common_comments':
                 comments._common_comments(),
             'user_comments':
@@ -147,7 +161,7 @@ def get_view_parameters(
 def get_download_data(
     download_id: str,
 ) -> Tuple[Iterator[SolutionFile], str]:
-    solution = Solution.get_or_none(Solution.id == download_id)
+    solution = Solution.get_with_details(download_id)
     shared_solution = SharedSolution.get_or_none(
         SharedSolution.shared_url == download_id,
     )
@@ -155,31 +169,55 @@ def get_download_data(
         raise ResourceNotFound('Solution does not exist.', 404)
 
     if shared_solution is None:
-        viewer_is_solver = solution.solver.id == current_user.id
+        viewer_is_solver = solution.solver_id == current_user.id
         has_viewer_access = current_user.role.is_viewer
         if not viewer_is_solver and not has_viewer_access:
             raise ForbiddenPermission(
                 'This user has no permissions to view this page.', 403,
             )
-        files = solution.files
-        filename = solution.exercise.subject
     else:
-        files = shared_solution.solution.files
-        filename = shared_solution.solution.exercise.subject
+        solution = Solution.get_with_details(shared_solution.solution_id)
+
+    return solution.files, solution.exercise.subject
+
+
+class _ZipChunks:
+    """Write-only stream that hands out what the archive wrote so far."""
 
-    return files, filename
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def pop(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _generate_zip(
+    files: Iterable[Union[SolutionFile, File]],
+) -> Iterator[bytes]:
+    stream = _ZipChunks()
+    with ZipFile(stream, 'w') as archive:
+        for file in files:
+            if not file.path.endswith(os.path.sep):
+                archive.writestr(file.path.strip(os.path.sep), file.code)
+                yield stream.pop()
+    yield stream.pop()
 
 
 def create_zip_from_solution(
     files: Iterable[Union[SolutionFile, File]],
-) -> bytes:
-    with BytesIO() as memory_file:
-        with ZipFile(memory_file, 'w') as archive:
-            for file in files:
-                if not file.path.endswith(os.path.sep):
-                    archive.writestr(file.path.strip(os.path.sep), file.code)
-        memory_file.seek(0)
-        return memory_file.read()
+) -> Iterator[bytes]:
+    # The files are read now, while the request still holds the database
+    # connection, and the archive is built file by file as it's sent.
+    return _generate_zip(tuple(files))
 
 
 def order_files(file: Dict[str, Any]) -> Tuple[str, bool]:
@@ -1,5 +1,6 @@
-from typing import List, Optional, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
+from celery import group
 from werkzeug.datastructures import FileStorage
 
 from lms.extractors.base import Extractor, File
@@ -12,30 +13,22 @@ from lms.lmsweb import config
 from lms.utils.log import log
 
 
-def _is_uploaded_before(
-    user: User,
-    exercise: Exercise,
-    file_hash: str,
-) -> bool:
-    return Solution.is_duplicate(
-        file_hash, user, exercise, already_hashed=True,
-    )
-
-
 def _upload_to_db(
         exercise_id: int,
+        exercise: Optional[Exercise],
         user: User,
         files: List[File],
         solution_hash: Optional[str] = None,
+        last_hash: Optional[str] = None,
 ) -> Solution:
-    exercise = Exercise.get_or_none(exercise_id)
     if exercise is None:
         raise UploadError(f'No such exercise id: {exercise_id}')
     elif not exercise.open_for_new_solutions():
         raise UploadError(
             f'Exercise {exercise_id} is closed for new solutions.')
 
-    if solution_hash and _is_uploaded_before(user, exercise, solution_hash):
+    solution_hash = Solution.files_hash(files, solution_hash)
+    if solution_hash and solution_hash == last_hash:
         raise AlreadyExists('You try to reupload an old solution.')
     elif not files:
         raise UploadError(f'There are no files to upload for {exercise_id}.')
@@ -45,31 +38,56 @@ def _upload_to_db(
         solver=user,
         files=files,
         hash_=solution_hash,
+        is_duplicate=False,
     )
 
 
-def _run_auto_checks(solution: Solution) -> None:
-    linters_tasks.run_linter_on_solution.apply_async(args=(solution.id,))
-    unittests_tasks.run_tests_for_solution.apply_async(args=(solution.id,))
+def _run_auto_checks(solutions: Iterable[Solution]) -> None:
+    checks = [
+        linters_tasks.run_linter_on_solution,
+        unittests_tasks.run_tests_for_solution,
+    ]
     if config.FEATURE_FLAG_CHECK_IDENTICAL_CODE_ON:
-        check_ident = identical_tests_tasks.solve_solution_with_identical_code
-        check_ident.apply_async(args=(solution.id,))
+        checks.append(identical_tests_tasks.solve_solution_with_identical_code)
+
+    tasks = [
+        check.s(solution.id) for solution in solutions for check in checks
+    ]
+    if tasks:
+        group(tasks).apply_async()
 
 
 def new(user: User, file: FileStorage) -> Tuple[List[int], List[int]]:
     matches: List[int] = []
     misses: List[int] = []
     errors: List[Union[UploadError, AlreadyExists]] = []
-    for exercise_id, files, solution_hash in Extractor(file):
+    solutions: List[Solution] = []
+    extracted = tuple(Extractor(file))
+    exercise_ids = [exercise_id for exercise_id, _, _ in extracted]
+    exercises: Dict[int, Exercise] = {
+        exercise.id: exercise
+        for exercise in Exercise.select().where(
+            Exercise.id.in_(exercise_ids),
+        )
+    }
+    last_hashes = Solution.last_hashes(user, exercise_ids)
+    for exercise_id, files, solution_hash in extracted:
+        exercise = exercises.get(exercise_id)
         try:
-            solution = _upload_to_db(exercise_id, user, files, solution_hash)
-            _run_auto_checks(solution)
+            solution = _upload_to_db(
+                exercise_id, exercise, user, files, solution_hash,
+                last_hashes.get(exercise_id),
+            )
         except (UploadError, AlreadyExists) as e:
             log.debug(e)
             errors.append(e)
             misses.append(exercise_id)
         else:
             matches.append(exercise_id)
+            solutions.append(solution)
+            last_hashes[exercise_id] = solution.hashed
+
+    _run_auto_checks(solutions)
 
     if not matches and errors:
         raise UploadError(errors)
@@ -1,3 +1,4 @@
+from functools import lru_cache
 import mimetypes
 
 
@@ -20,15 +21,21 @@ LANGUAGE_EXTENSIONS_TO_NAMES = {
     'yml': 'yaml',
 }
 
-ALLOWED_EXTENSIONS = set(LANGUAGE_EXTENSIONS_TO_NAMES)
+ALLOWED_EXTENSIONS = frozenset(LANGUAGE_EXTENSIONS_TO_NAMES)
 
-ALLOWED_IMAGES_EXTENSIONS = {'png', 'jpeg', 'jpg', 'svg', 'tiff', 'bmp', 'ico'}
+ALLOWED_IMAGES_EXTENSIONS = frozenset((
+    'png', 'jpeg', 'jpg', 'svg', 'tiff', 'bmp', 'ico',
+))
 
 
+@lru_cache(maxsize=64)
 def get_language_name_by_extension(ext: str) -> str:
     return LANGUAGE_EXTENSIONS_TO_NAMES.get(ext, ext)
 
 
+@lru_cache(maxsize=64)
 def get_mime_type_by_extention(ext: str) -> str:
+    # init() reads the system mime tables again, so it runs only once for
+    # every extension.
     mimetypes.init()
     return mimetypes.types_map[ext]
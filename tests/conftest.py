@@ -1,5 +1,6 @@
 import datetime
 from functools import wraps
+import itertools
 from lms.models import notes
 import os
 import random
@@ -12,13 +13,19 @@ import pytest
 
 from lms.lmsdb.models import (
     ALL_MODELS, Comment, CommentText, Exercise, Note, Notification, Role,
-    RoleOptions, SharedSolution, Solution, User,
+    RoleOptions, SharedSolution, Solution, User, clear_exercises_cache,
 )
 from lms.extractors.base import File
 from lms.lmstests.public import celery_app as public_app
 from lms.lmstests.sandbox import celery_app as sandbox_app
 from lms.lmsweb import limiter, routes, webapp
-from lms.models import notifications
+from lms.models import comments, notifications
+
+
+# Solutions with the same code are duplicates, so every default code gets
+# its own number in front of a constant body.
+_DEFAULT_CODE = 'x' * 100
+_default_code_numbers = itertools.count()
 
 
 @pytest.fixture(autouse=True, scope='session')
@@ -47,6 +54,8 @@ def db(db_in_memory):
     with db_in_memory.atomic():
         yield db_in_memory
         db_in_memory.rollback()
+    comments.clear_common_comments_cache()
+    clear_exercises_cache()
 
 
 @pytest.fixture(autouse=True, scope='session')
@@ -114,6 +123,35 @@ def create_user(
     )
 
 
+def create_users(
+        count: int,
+        role_name: str = RoleOptions.STUDENT.value,
+) -> List[User]:
+    # insert_many skips the save signals, so the secrets are hashed here,
+    # once for all of the users.
+    password = User.hash_secret('fake pass')  # NOQA: S106
+    api_key = User.hash_secret('fake key')
+    role = Role.by_name(role_name)
+    usernames = [f'{role_name}-{index}' for index in range(count)]
+    with User._meta.database.atomic():
+        User.insert_many([
+            {
+                User.username.name: username,
+                User.fullname.name: f'A{role_name}',
+                User.mail_address.name: f'so-{username}@mail.com',
+                User.password.name: password,
+                User.api_key.name: api_key,
+                User.role.name: role,
+            }
+            for username in usernames
+        ]).execute()
+    return list(
+        User.select()
+        .where(User.username.in_(usernames))
+        .order_by(User.id),
+    )
+
+
 def create_banned_user(index: int = 0) -> User:
     return create_user(RoleOptions.BANNED.value, index)
 
@@ -215,7 +253,7 @@ def create_solution(
         hash_: Optional[str] = None,
 ) -> Solution:
     if code is None:
-        code = ''.join(random.choices(string.printable, k=100))
+        code = f'# {next(_default_code_numbers)}\n{_DEFAULT_CODE}'
 
     if files is None:
         files = [File('exercise.py', code)]
@@ -16,9 +16,9 @@ class TestAutoSolutionSolver:
             first_solution_code=SOME_CODE,
             second_solution_code=SOME_CODE,
         )
-        assert len(tuple(s_solution.comments)) == 0
+        assert s_solution.comments.count() == 0
         tasks.solve_solution_with_identical_code(s_solution.id)
-        assert len(tuple(s_solution.comments)) == 1
+        assert s_solution.comments.count() == 1
 
         user_notifications = notifications.get(user=s_solution.solver)
         assert len(user_notifications) == 1
@@ -38,9 +38,9 @@ class TestAutoSolutionSolver:
             second_solution_code=SOME_CODE,
         )
 
-        assert len(tuple(another_solution.comments)) == 0
+        assert another_solution.comments.count() == 0
         tasks.solve_solution_with_identical_code(another_solution.id)
-        assert len(tuple(another_solution.comments)) == 0
+        assert another_solution.comments.count() == 0
         assert another_solution.state == models.Solution.STATES.CREATED.name
 
     def test_check_if_other_solutions_can_be_solved(
@@ -54,9 +54,9 @@ class TestAutoSolutionSolver:
                 second_solution_code=SOME_CODE,
             ))
 
-        assert len(tuple(another_solution.comments)) == 0
+        assert another_solution.comments.count() == 0
         tasks.check_if_other_solutions_can_be_solved(first_solution.id)
-        assert len(tuple(another_solution.comments)) == 1
+        assert another_solution.comments.count() == 1
 
         user_notifications = notifications.get(user=another_solution.solver)
         assert len(user_notifications) == 1
@@ -75,9 +75,9 @@ class TestAutoSolutionSolver:
                 second_solution_code=SOME_CODE * 2,
             ))
 
-        assert len(tuple(another_solution.comments)) == 0
+        assert another_solution.comments.count() == 0
         tasks.check_if_other_solutions_can_be_solved(first_solution.id)
-        assert len(tuple(another_solution.comments)) == 0
+        assert another_solution.comments.count() == 0
 
     @staticmethod
     def _duplicate_solution_from_comment(
@@ -1,6 +1,7 @@
 import datetime
 
-from lms.lmsdb.models import Exercise
+from lms.lmsdb.models import Exercise, User
+from tests import conftest
 
 
 class TestExercise:
@@ -20,3 +21,29 @@ class TestExercise:
         exercise.due_date = after_due_date
         exercise.save()
         assert exercise.open_for_new_solutions()
+
+    def test_archived_flag(self, student_user: User):
+        conftest.create_exercise()
+        conftest.create_exercise(1, is_archived=True)
+        client = conftest.get_logged_user(student_user.username)
+
+        all_exercises = client.get('/exercises?archived=1')
+        assert all_exercises.status_code == 200
+        assert b'?archived=1' not in all_exercises.data
+
+        for value in ('0', 'false', ''):
+            open_exercises = client.get(f'/exercises?archived={value}')
+            assert open_exercises.status_code == 200
+            assert b'?archived=1' in open_exercises.data
+
+    def test_cached_dicts(self, exercise: Exercise):
+        assert len(Exercise.cached_dicts()) == 1
+
+        # Saving an exercise clears the cached exercises
+        exercise.is_archived = True
+        exercise.save()
+        assert not Exercise.cached_dicts()
+        assert len(Exercise.cached_dicts(fetch_archived=True)) == 1
+
+        exercise.delete_instance()
+        assert not Exercise.cached_dicts(fetch_archived=True)
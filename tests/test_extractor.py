@@ -1,6 +1,7 @@
+from functools import lru_cache
 from io import BufferedReader, BytesIO
 from tempfile import SpooledTemporaryFile
-from typing import Iterator, List, Tuple
+from typing import Iterator, Tuple
 from zipfile import ZipFile
 
 from flask import json
@@ -35,7 +36,6 @@ class TestExtractor:
         self.pyfile_no_exercise_file = next(self.py_files(
             (self.PY_NO_EXERCISE,),
         ))
-        self.zipfile_file = next(self.zip_files((self.IGNORE_FILES_ZIP_NAME,)))
         self.ipynb_storage = FileStorage(self.ipynb_file)
         self.image_storage = FileStorage(self.image_file)
         self.image_no_exercise_storage = FileStorage(
@@ -49,15 +49,13 @@ class TestExtractor:
             self.pyfile_no_exercise_file,
         )
         self.zipfile_storage = self.create_zipfile_storage(
-            self.zipfile_file, self.IGNORE_FILES_ZIP_NAME,
+            self.IGNORE_FILES_ZIP_NAME,
         )
-        self.zipfiles_extractor_files = list(self.zip_files(self.ZIP_FILES))
         self.zipfiles_extractors_bytes_io = list(self.get_bytes_io_zip_files(
-            self.zipfiles_extractor_files, self.ZIP_FILES,
+            self.ZIP_FILES,
         ))
-        self.zipbomb_file_list = list(self.zip_files((self.ZIP_BOMB_FILE,)))
         self.zipbomb_bytes_io = next(self.get_bytes_io_zip_files(
-            self.zipbomb_file_list, (self.ZIP_BOMB_FILE,),
+            (self.ZIP_BOMB_FILE,),
         ))
 
     def teardown(self):
@@ -65,12 +63,9 @@ class TestExtractor:
         self.image_file.close()
         self.image_no_exercise_file.close()
         self.pyfile_no_exercise_file.close()
-        self.zipfile_file.close()
-        self.zipbomb_file_list[0].close()
+        self.zipfile_storage.close()
         for py_file in self.pyfiles_files:
             py_file.close()
-        for zip_file in self.zipfiles_extractor_files:
-            zip_file.close()
         for bytes_io, _ in self.zipfiles_extractors_bytes_io:
             bytes_io.close()
 
@@ -88,22 +83,27 @@ class TestExtractor:
             yield open(f'{SAMPLES_DIR}/{filename}', 'br')
 
     @staticmethod
-    def create_zipfile_storage(
-        opened_file: BufferedReader, filename: str,
-    ) -> FileStorage:
+    @lru_cache(maxsize=None)
+    def sample_bytes(filename: str) -> bytes:
+        with open(f'{SAMPLES_DIR}/{filename}', 'rb') as sample:
+            return sample.read()
+
+    @classmethod
+    def create_zipfile_storage(cls, filename: str) -> FileStorage:
+        # Uploads are spooled by werkzeug, and the zip extractor opens the
+        # spooled file itself. The sample is read from the disk only once.
         spooled = SpooledTemporaryFile()
-        spooled.write(opened_file.read())
+        spooled.write(cls.sample_bytes(filename))
         zip_file_storage = FileStorage(spooled)
         zip_file_storage.filename = filename
-        opened_file.seek(0)
         return zip_file_storage
 
-    @staticmethod
+    @classmethod
     def get_bytes_io_zip_files(
-        files: List[BufferedReader], filesnames: Tuple[str, ...],
+        cls, filesnames: Tuple[str, ...],
     ) -> Iterator[Tuple[BytesIO, str]]:
-        for file, name in zip(files, filesnames):
-            yield BytesIO(file.read()), name
+        for name in filesnames:
+            yield BytesIO(cls.sample_bytes(name)), name
 
     def get_zip_filenames(self):
         the_zip = ZipFile(f'{SAMPLES_DIR}/{self.IGNORE_FILES_ZIP_NAME}')
@@ -1,5 +1,6 @@
 from lms.lmsdb.models import User
 from lms.lmsweb import webapp
+from lms.lmsweb.redirections import is_safe_url
 
 
 class TestLogin:
@@ -32,3 +33,22 @@ class TestLogin:
         }, follow_redirects=True)
         success_login_response = client.get('/exercises')
         assert success_login_response.status_code == 200
+
+    @staticmethod
+    def test_managers_pages_require_login():
+        client = webapp.test_client()
+        for page in ('/status', '/check/1', '/common_comments'):
+            fail_login_response = client.get(page)
+            assert fail_login_response.status_code == 302
+
+    @staticmethod
+    def test_is_safe_url():
+        unsafe_targets = (
+            '//evil.com', '/\\evil.com', '/\t/evil.com', '/\n/evil.com',
+            '/\r/evil.com', '/\x00/evil.com', '/\x7f/evil.com',
+            'https://evil.com/', 'javascript:alert(1)',
+        )
+        safe_targets = ('', None, '/', '/exercises', '/view/1?file=2')
+        with webapp.test_request_context():
+            assert not any(map(is_safe_url, unsafe_targets))
+            assert all(map(is_safe_url, safe_targets))
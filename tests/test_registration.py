@@ -0,0 +1,59 @@
+from unittest import mock
+
+from lms.lmsdb.models import User
+from lms.lmstests.public.mails import services
+from lms.lmsweb.tools import registration as registration_tool
+from lms.lmsweb.tools.registration import UserRegistrationCreator, UserToCreate
+
+
+FAILING_EMAIL = 'fail@mail.com'
+
+
+def fake_post(url, data, auth):
+    if data['to'] == FAILING_EMAIL:
+        raise ConnectionError('Mail API is down')
+    return mock.Mock()
+
+
+class TestRegistration:
+    @staticmethod
+    @mock.patch.object(services, 'log')
+    @mock.patch.object(services._session, 'post', side_effect=fake_post)
+    def test_failed_emails_are_logged(post: mock.Mock, log: mock.Mock):
+        users = [
+            UserToCreate('Ok', 'ok@mail.com', 'fake pass'),
+            UserToCreate('Fail', FAILING_EMAIL, 'fake pass'),
+        ]
+        registration = UserRegistrationCreator(users)
+        registration.run_registration()
+
+        assert post.call_count == 2
+        log.exception.assert_called_once()
+        assert FAILING_EMAIL in log.exception.call_args.args
+        assert registration.failed_users == []
+        assert User.select().where(
+            User.mail_address.in_([user.email for user in users]),
+        ).count() == 2
+
+    @staticmethod
+    @mock.patch.object(registration_tool, 'log')
+    @mock.patch.object(services._session, 'post', side_effect=fake_post)
+    def test_only_new_users_are_created(
+        post: mock.Mock, log: mock.Mock, student_user: User,
+    ):
+        users = [
+            UserToCreate('Existing', student_user.mail_address, 'fake pass'),
+            UserToCreate('Taken username', student_user.username, 'fake'),
+            UserToCreate('New', 'new@mail.com', 'fake pass'),
+        ]
+        registration = UserRegistrationCreator(users)
+        registration.run_registration()
+
+        post.assert_called_once()
+        assert post.call_args.kwargs['data']['to'] == users[2].email
+        assert registration.failed_users == [users[1]]
+        log.info.assert_any_call(
+            'User %s is already registered, skipping', users[0].email,
+        )
+        assert User.get_or_none(User.mail_address == users[2].email)
+        assert User.get_or_none(User.mail_address == users[1].email) is None
@@ -1,4 +1,5 @@
-from lms.models.errors import ResourceNotFound
+from lms.extractors.base import File
+from lms.models.errors import AlreadyExists, ResourceNotFound
 from lms.models.solutions import get_view_parameters
 from unittest import mock
 
@@ -8,7 +9,7 @@ import pytest
 from lms.lmsdb.models import Comment, Exercise, SharedSolution, Solution, User
 from lms.lmstests.public.general import tasks as general_tasks
 from lms.lmsweb import routes
-from lms.models import notifications, solutions
+from lms.models import notifications, solutions, upload
 from tests import conftest
 
 
@@ -113,6 +114,80 @@ class TestSolutionDb:
         assert next_unchecked is not None
         assert next_unchecked.id == first_solution.id
 
+    @staticmethod
+    def test_left_in_exercise(exercise: Exercise, staff_user: User):
+        assert Solution.left_in_exercise(exercise) == 0
+
+        students = conftest.create_users(3)
+        solutions = [
+            conftest.create_solution(exercise, student)
+            for student in students
+        ]
+        assert Solution.left_in_exercise(exercise) == 0
+
+        solutions[0].mark_as_checked(by=staff_user)
+        assert Solution.left_in_exercise(exercise) == 33
+
+    @staticmethod
+    def test_status(exercise: Exercise, staff_user: User):
+        conftest.create_exercise(1)
+        students = conftest.create_users(3)
+        solutions = [
+            conftest.create_solution(exercise, student)
+            for student in students
+        ]
+        solutions[0].mark_as_checked(by=staff_user)
+        # Only the newest solution of a student is still active
+        conftest.create_solution(exercise, students[1])
+
+        (status,) = Solution.status()
+        assert status['id'] == exercise.id
+        assert status['name'] == exercise.subject
+        assert status['submitted'] == 3
+        assert status['checked'] == 1
+
+    @staticmethod
+    def test_reupload_uses_last_hash(exercise: Exercise, student_user: User):
+        solution = conftest.create_solution(exercise, student_user)
+        files = [File('exercise.py', solution.solution_files[0].code)]
+        last_hashes = Solution.last_hashes(student_user, [exercise.id])
+        assert last_hashes[exercise.id] == Solution.files_hash(files)
+
+        with mock.patch.object(Solution, 'is_duplicate') as is_duplicate:
+            with pytest.raises(AlreadyExists):
+                upload._upload_to_db(
+                    exercise.id, exercise, student_user, files,
+                    last_hash=last_hashes[exercise.id],
+                )
+            files = [File('exercise.py', '# Something new')]
+            upload._upload_to_db(
+                exercise.id, exercise, student_user, files,
+                last_hash=last_hashes[exercise.id],
+            )
+        is_duplicate.assert_not_called()
+
+    @staticmethod
+    def test_of_user(exercise: Exercise, student_user: User, comment: Comment):
+        unsolved_exercise = conftest.create_exercise(index=1)
+        archived_exercise = conftest.create_exercise(2, is_archived=True)
+        conftest.create_solution(archived_exercise, student_user)
+        solution = comment.solution
+        solution.mark_as_checked(by=comment.commenter)
+
+        exercises = Solution.of_user(student_user.id)
+        assert len(exercises) == 2
+        solved, unsolved = exercises
+        assert solved['exercise_id'] == exercise.id
+        assert solved['solution_id'] == solution.id
+        assert solved['is_checked']
+        assert solved['comments_num'] == 1
+        assert solved['checker'] == comment.commenter.fullname
+        assert unsolved['exercise_id'] == unsolved_exercise.id
+        assert 'solution_id' not in unsolved
+
+        exercises = Solution.of_user(student_user.id, with_archived=True)
+        assert len(exercises) == 3
+
 
 class TestSolutionBridge:
     @staticmethod
@@ -257,6 +332,13 @@ class TestSolutionBridge:
         )
         assert disable_comment_response.status_code == 403
 
+    @staticmethod
+    def test_common_comments_with_invalid_exercise(staff_user: User):
+        client = conftest.get_logged_user(staff_user.username)
+        response = client.get('/common_comments/not-a-number')
+        assert response.status_code == 200
+        assert json.loads(response.get_data(as_text=True)) == []
+
     @staticmethod
     def test_staff_and_user_comments(
         exercise: Exercise,